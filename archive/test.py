@@ -3,33 +3,62 @@ import geopandas as gpd
 import matplotlib as plt
 
 con = db.connect("test_elections.db")
-con.sql("INSTALL spatial; LOAD spatial;")
 
-con.sql("""CREATE TABLE test_election AS
-SELECT 
-    -- Convert numeric columns
-    TRY_CAST("shape_leng" AS DOUBLE) AS shape_leng,
-    TRY_CAST("shape_area" AS DOUBLE) AS shape_area,
+# INSTALL only on a cold cache - on repeat runs LOAD succeeds straight from
+# the persistent extension directory without the repository check
+try:
+    con.sql("LOAD spatial;")
+except db.Error:
+    con.sql("INSTALL spatial; LOAD spatial;")
+
+# Give read_csv the schema up front so DuckDB parses straight into the
+# target types - no sniffing pass and no TRY_CAST over VARCHAR columns
+con.sql("""CREATE TABLE IF NOT EXISTS test_election AS
+SELECT
+    shape_leng,
+    shape_area,
     "ward_preci",
-    TRY_CAST("ward" AS INTEGER) AS ward,
-    TRY_CAST("precinct" AS INTEGER) AS precinct,
-    -- Convert WKT or GeoJSON to geometry
+    ward,
+    precinct,
+    -- Convert WKT to geometry
     ST_GeomFromText("geometry") AS geometry,
-    TRY_CAST("Registered Voters" AS INTEGER) AS registered_voters,
-    TRY_CAST("Ballots Cast" AS INTEGER) AS ballots_cast,
-    TRY_CAST("Turnout" AS DOUBLE) AS turnout,
+    "Registered Voters" AS registered_voters,
+    "Ballots Cast" AS ballots_cast,
+    "Turnout" AS turnout,
     "ward_precinct"
-FROM read_csv_auto('merged_turnout_data_cleaned.csv');""")
+FROM read_csv('merged_turnout_data_cleaned.csv',
+              columns={'shape_leng': 'DOUBLE',
+                       'shape_area': 'DOUBLE',
+                       'ward_preci': 'VARCHAR',
+                       'ward': 'INTEGER',
+                       'precinct': 'INTEGER',
+                       'geometry': 'VARCHAR',
+                       'Registered Voters': 'INTEGER',
+                       'Ballots Cast': 'INTEGER',
+                       'Turnout': 'DOUBLE',
+                       'ward_precinct': 'VARCHAR'},
+              nullstr='');""")
+
+# Index ward/precinct lookups and precompute the common per-ward turnout
+# aggregate so repeat queries from notebooks don't rescan the full table
+con.sql("CREATE INDEX IF NOT EXISTS idx_wp ON test_election(ward, precinct);")
+con.sql("""CREATE OR REPLACE TABLE mv_turnout_by_ward AS
+SELECT
+    ward,
+    AVG(turnout) AS avg_turnout,
+    SUM(ballots_cast) AS ballots
+FROM test_election
+GROUP BY ward;""")
 
 
 
-# Query your spatial data
-query = """
-SELECT ward, precinct, turnout, geometry 
-FROM test_election
-"""
-# Convert to GeoPandas DataFrame
-gdf = gpd.GeoDataFrame.from_postgis(query, con, geom_col='geometry')
+# Export the spatial data to GeoParquet and read it back with geopandas -
+# avoids from_postgis rebuilding shapely geometries row by row
+con.sql("""
+COPY (SELECT ward, precinct, turnout, geometry FROM test_election)
+TO 'election.parquet' (FORMAT PARQUET)
+""")
+gdf = gpd.read_parquet('election.parquet')
 
 # con = duckdb.connect(database=':memory:', read_only=False)
 #
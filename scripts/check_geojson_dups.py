@@ -1,86 +1,158 @@
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
-import geopandas as gpd
+import duckdb
 import pandas as pd
 
 
-def check_duplicates(filepath):
+def build_pid_expr(columns):
     """
-    Check for duplicate precinct IDs in a GeoJSON file.
-    
+    Build the SQL expression that yields a precinct id for a GeoJSON source.
+
     Args:
-        filepath: Path to the GeoJSON file
+        columns: List of column names available in the file
     """
-    print(f"Checking for duplicates in {Path(filepath).name}...")
-    
-    # Read the GeoJSON with geopandas
-    gdf = gpd.read_file(filepath)
-    
-    # Print column names
-    print(f"Available columns: {gdf.columns.tolist()}")
-    
-    # Look for precinct_id in properties
-    precinct_id_field = None
     possible_fields = ['precinct_id', 'PRECINCT_ID', 'precinct', 'PRECINCT', 'ID']
-    
+
     for field in possible_fields:
-        if field in gdf.columns:
-            precinct_id_field = field
-            break
-    
+        if field in columns:
+            print(f"Using {field} as precinct_id")
+            return f'CAST("{field}" AS VARCHAR)'
+
     # If no direct field found, check if we need to combine ward and precinct
-    if precinct_id_field is None and 'ward' in gdf.columns and 'precinct' in gdf.columns:
+    if 'ward' in columns and 'precinct' in columns:
         print("Creating precinct_id from ward and precinct columns")
-        # Combine ward and precinct
-        gdf['precinct_id'] = gdf['ward'].astype(str).str.zfill(2) + gdf['precinct'].astype(str).str.zfill(3)
-    elif precinct_id_field:
-        print(f"Using {precinct_id_field} as precinct_id")
-        gdf['precinct_id'] = gdf[precinct_id_field].astype(str)
-    else:
-        raise ValueError("Could not find a suitable precinct ID column in the GeoJSON")
-    
-    # Check for duplicates
-    duplicates = gdf['precinct_id'].duplicated(keep=False)
-    duplicate_count = duplicates.sum()
-    
+        # Combine ward and precinct (2 digit ward + 3 digit precinct)
+        return "lpad(ward::VARCHAR, 2, '0') || lpad(precinct::VARCHAR, 3, '0')"
+
+    raise ValueError("Could not find a suitable precinct ID column in the GeoJSON")
+
+
+def check_duplicates(filepath):
+    """
+    Check for duplicate precinct IDs in a GeoJSON file.
+
+    Args:
+        filepath: Path to the GeoJSON file
+    """
+    print(f"Checking for duplicates in {Path(filepath).name}...")
+
+    # Scan the GeoJSON directly with DuckDB's spatial extension so the
+    # aggregations below run in the database instead of pandas
+    con = duckdb.connect()
+    con.execute("INSTALL spatial;")
+    con.execute("LOAD spatial;")
+
+    source = f"ST_Read('{filepath}')"
+
+    # Peek at the available columns without reading any features
+    columns = [
+        desc[0] for desc in con.execute(f"SELECT * FROM {source} LIMIT 0").description
+    ]
+    print(f"Available columns: {columns}")
+
+    pid_expr = build_pid_expr(columns)
+
+    # Check for duplicates - a single GROUP BY pass over the file
+    dup_df = con.execute(
+        f"""
+        SELECT {pid_expr} AS pid, COUNT(*) AS count
+        FROM {source}
+        GROUP BY pid
+        HAVING COUNT(*) > 1
+        ORDER BY count DESC
+        """
+    ).df()
+    dup_values = pd.Series(dup_df['count'].values, index=dup_df['pid'], name='count')
+    duplicate_count = int(dup_values.sum())
+
     if duplicate_count > 0:
         print(f"Found {duplicate_count} duplicate precinct IDs!")
-        
-        # Get all duplicate IDs and their counts
-        dup_values = gdf.loc[duplicates, 'precinct_id'].value_counts()
+
+        # One formatted write instead of a print call per duplicate id
         print("\nDuplicate IDs and their counts:")
-        for precinct_id, count in dup_values.items():
-            print(f"  Precinct ID: {precinct_id}, Count: {count}")
-        
-        # Show a sample of the duplicate records
+        print(dup_values.head(1000).to_string(header=False))
+
+        # Show a sample of the duplicate records (up to 5 records for each of
+        # the first 5 duplicate IDs). The duplicate counts are already in
+        # dup_values, so reuse them instead of re-aggregating the file
         print("\nSample of duplicate records:")
-        for precinct_id in dup_values.index[:min(5, len(dup_values))]:  # Show details for first 5 duplicates
-            print(f"\nDetails for duplicate precinct ID: {precinct_id}")
-            dup_records = gdf[gdf['precinct_id'] == precinct_id]
-            for idx, row in dup_records.iterrows():
-                print(f"  Record {idx}:")
-                for col in gdf.columns:
-                    if col != 'geometry':  # Skip printing the full geometry
-                        print(f"    {col}: {row[col]}")
+        top_ids = dup_values.index[:min(5, len(dup_values))].tolist()
+        placeholders = ", ".join("?" for _ in top_ids)
+        sample_df = con.execute(
+            f"""
+            SELECT * EXCLUDE (geom)
+            FROM (SELECT *, {pid_expr} AS pid FROM {source})
+            WHERE pid IN ({placeholders})
+            QUALIFY row_number() OVER (PARTITION BY pid) <= 5
+            ORDER BY pid
+            """,
+            top_ids,
+        ).df()
+
+        # One C-level conversion to plain dicts instead of boxing every
+        # cell through iterrows
+        records = sample_df.to_dict(orient='records')
+        for idx, record in enumerate(records):
+            print(f"  Record {idx}:")
+            for col, value in record.items():
+                print(f"    {col}: {value}")
     else:
         print("No duplicate precinct IDs found!")
-    
-    # Check for empty/null precinct IDs which might cause issues
-    null_ids = gdf['precinct_id'].isnull() | (gdf['precinct_id'] == '')
-    null_count = null_ids.sum()
-    
+
+    # Check for empty/null precinct IDs and the problematic '00000' id in a
+    # single pass over the column instead of one scan per check
+    null_count, zeros_count = con.execute(
+        f"""
+        SELECT
+            COUNT(*) FILTER (pid IS NULL OR pid = '') AS null_count,
+            COUNT(*) FILTER (pid = '00000') AS zeros_count
+        FROM (SELECT {pid_expr} AS pid FROM {source})
+        """
+    ).fetchone()
+
     if null_count > 0:
         print(f"\nWARNING: Found {null_count} empty or null precinct IDs!")
         print("Sample of records with null/empty IDs:")
-        print(gdf[null_ids].head())
-    
-    # Check for precinct ID "00000" specifically (mentioned in the error)
-    zeros_ids = gdf['precinct_id'] == "00000"
-    zeros_count = zeros_ids.sum()
-    
+        print(
+            con.execute(
+                f"""
+                SELECT * EXCLUDE (geom), {pid_expr} AS pid FROM {source}
+                WHERE {pid_expr} IS NULL OR {pid_expr} = ''
+                LIMIT 5
+                """
+            ).df()
+        )
+
+    # Precinct ID "00000" specifically (mentioned in the error)
     if zeros_count > 0:
         print(f"\nWARNING: Found {zeros_count} records with precinct ID '00000'!")
         print("Sample of these records:")
-        print(gdf[zeros_ids].head())
-    
+        print(
+            con.execute(
+                f"SELECT * EXCLUDE (geom), {pid_expr} AS pid FROM {source} WHERE {pid_expr} = '00000' LIMIT 5"
+            ).df()
+        )
+
     return dup_values if duplicate_count > 0 else pd.Series()
+
+
+def check_files(filepaths):
+    """Check several GeoJSON files in parallel, one worker per file."""
+    if not filepaths:
+        print("No GeoJSON files to check.")
+        return {}
+
+    with ProcessPoolExecutor(max_workers=min(len(filepaths), 4)) as executor:
+        results = list(executor.map(check_duplicates, filepaths))
+
+    print("\nSummary:")
+    for filepath, dup_values in zip(filepaths, results):
+        print(f"  {Path(filepath).name}: {len(dup_values)} duplicated precinct IDs")
+    return dict(zip(filepaths, results))
+
+
+if __name__ == "__main__":
+    paths = sys.argv[1:] or sorted(str(p) for p in Path("precincts").glob("*.geojson"))
+    check_files(paths)
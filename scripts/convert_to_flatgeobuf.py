@@ -0,0 +1,30 @@
+import geopandas as gpd
+from pathlib import Path
+
+# Read files through pyogrio's vectorized GDAL reader instead of Fiona's
+# per-feature iterator
+gpd.options.io_engine = "pyogrio"
+
+
+def convert_precincts(precincts_dir="precincts"):
+    """
+    Convert the precinct GeoJSON files to FlatGeobuf.
+
+    FlatGeobuf is a binary, indexed format that parses several times faster
+    than GeoJSON's per-feature JSON - import_geometries.py picks up the
+    .fgb files automatically when they sit next to the originals. Run this
+    once after updating any of the source GeoJSON files.
+    """
+    converted = 0
+    for geojson_path in sorted(Path(precincts_dir).glob("*_precincts.geojson")):
+        fgb_path = geojson_path.with_suffix(".fgb")
+        print(f"Converting {geojson_path.name} -> {fgb_path.name}...")
+        gdf = gpd.read_file(geojson_path, use_arrow=True)
+        gdf.to_file(fgb_path, driver="FlatGeobuf")
+        print(f"  {len(gdf)} features written")
+        converted += 1
+    print(f"Converted {converted} files.")
+
+
+if __name__ == "__main__":
+    convert_precincts()
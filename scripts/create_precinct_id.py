@@ -1,7 +1,16 @@
 import os
+
+# Cap Polars threads per worker process so the pool below doesn't
+# oversubscribe the CPU (must be set before polars is imported)
+os.environ.setdefault("POLARS_MAX_THREADS", "2")
+
 import polars as pl
+import functools
 import re
 import logging
+import multiprocessing
+import sys
+from concurrent.futures import ProcessPoolExecutor
 from pathlib import Path
 
 # Set up path handling
@@ -21,66 +30,148 @@ logging.basicConfig(
 WARD_PATTERN = re.compile(r'ward', re.IGNORECASE)
 PRECINCT_PATTERN = re.compile(r'precinct', re.IGNORECASE)
 OUTPUT_ID_COLUMN = 'precinct_id'
+OUTPUT_ID_LOWER = OUTPUT_ID_COLUMN.lower()
 ID_COLUMNS_TO_REMOVE = ['id', 'ID']
+ID_SET = frozenset(ID_COLUMNS_TO_REMOVE)
 
-def find_column_by_pattern(columns, pattern):
-    """Find a column name that matches the given pattern."""
+@functools.lru_cache(maxsize=64)
+def resolve_columns(columns):
+    """Find the ward and precinct columns in one pass over the header.
+
+    Cached on the header tuple, so CSVs sharing a layout skip the
+    regex matching entirely.
+    """
+    ward_col = None
+    precinct_col = None
     for col in columns:
-        if pattern.search(str(col)):
-            return col
-    return None
+        name = str(col)
+        if ward_col is None and WARD_PATTERN.search(name):
+            ward_col = col
+        if precinct_col is None and PRECINCT_PATTERN.search(name):
+            precinct_col = col
+        if ward_col and precinct_col:
+            break
+    return ward_col, precinct_col
 
 def process_csv(csv_path, dir_name, csv_name):
     """Process a single CSV file to create a precinct_id field."""
     try:
-        # Read the CSV file
-        df = pl.read_csv(csv_path)
-        
-        # Find ward and precinct columns
-        columns = df.columns
-        ward_col = find_column_by_pattern(columns, WARD_PATTERN)
-        precinct_col = find_column_by_pattern(columns, PRECINCT_PATTERN)
+        # Scan the CSV lazily so rows stream through in batches instead of
+        # materializing the whole file in memory
+        lf = pl.scan_csv(csv_path)
+
+        # Find ward and precinct columns (schema only - no data is read)
+        schema = lf.collect_schema()
+        columns = schema.names()
+        ward_col, precinct_col = resolve_columns(tuple(columns))
         
         if not ward_col or not precinct_col:
             logging.error(f"Missing ward or precinct column in directory {dir_name} csv {csv_name}")
-            return
+            return False
         
         # Log the found columns
         logging.info(f"Found ward column: {ward_col} and precinct column: {precinct_col} in {csv_name}")
         
-        # Create the precinct_id using a different approach
-        # Instead of format(), we'll concatenate strings after formatting the numbers
-        df = df.with_columns([
+        # Create the precinct_id with integer arithmetic: the id is always a
+        # 5-digit number (2-digit ward + 3-digit precinct), so compute
+        # ward*1000 + precinct and zero-pad once instead of padding and
+        # concatenating two intermediate string columns
+        # Project away unwanted ID columns before any other work so the
+        # optimizer pushes the selection into the scan and the parser never
+        # converts the dropped columns
+        keep_cols = [
+            col for col, lower in ((col, col.lower()) for col in columns)
+            if not (col in ID_SET or ('id' in lower and lower != OUTPUT_ID_LOWER))
+        ]
+        if len(keep_cols) != len(columns):
+            lf = lf.select(keep_cols)
+
+        def as_int(col):
+            # Skip the cast when the CSV already parsed the column as integer
+            if schema[col].is_integer():
+                return pl.col(col)
+            return pl.col(col).cast(pl.Int32)
+
+        lf = lf.with_columns([
             pl.when(pl.col(ward_col).is_not_null() & pl.col(precinct_col).is_not_null())
             .then(
-                # Convert ward to 2-digit string and precinct to 3-digit string
-                pl.col(ward_col).cast(pl.Int32).cast(pl.Utf8).str.zfill(2) + 
-                pl.col(precinct_col).cast(pl.Int32).cast(pl.Utf8).str.zfill(3)
+                (as_int(ward_col) * 1000 + as_int(precinct_col))
+                .cast(pl.Utf8)
+                .str.pad_start(5, "0")
             )
             .otherwise(None)
             .alias(OUTPUT_ID_COLUMN)
         ])
-        
-        # Remove unwanted ID columns
-        columns_to_drop = []
-        for col in columns:
-            if col in ID_COLUMNS_TO_REMOVE or ('id' in col.lower() and col.lower() != OUTPUT_ID_COLUMN.lower()):
-                columns_to_drop.append(col)
-        
-        if columns_to_drop:
-            df = df.drop(columns_to_drop)
-        
+
         # Log sample created IDs
-        sample_ids = df.select(pl.col(OUTPUT_ID_COLUMN)).head(5).to_series().to_list()
+        sample_ids = lf.select(pl.col(OUTPUT_ID_COLUMN)).head(5).collect().to_series().to_list()
         logging.info(f"Sample created IDs from {dir_name} csv {csv_name}: {sample_ids}")
-        
-        # Save the updated CSV
-        df.write_csv(csv_path)
+
+        # Stream the updated CSV to a temp file, then swap it into place so a
+        # failed run can't leave a half-written file behind. The pid keeps
+        # temp names unique if a retry overlaps a dying worker
+        tmp_path = csv_path.with_suffix(f'.csv.{os.getpid()}.tmp')
+        try:
+            lf.sink_csv(tmp_path)
+            os.replace(tmp_path, csv_path)
+        finally:
+            tmp_path.unlink(missing_ok=True)
         logging.info(f"Successfully processed directory {dir_name} csv {csv_name}")
-        
+        return True
+
     except Exception as e:
         logging.error(f"Error processing directory {dir_name} csv {csv_name}: {str(e)}")
         logging.error(f"Error details: {type(e).__name__}")
+        return False
+
+def ingest_duckdb_direct():
+    """Batch-ingest every CSV in one DuckDB pass instead of rewriting files.
+
+    DuckDB's parallel CSV reader parses all files in a single glob scan,
+    builds precinct_id in SQL, and exports one Parquet file for downstream
+    use - no per-file read/transform/write loop.
+    """
+    import duckdb
+
+    source = f"read_csv('{DATA_DIR}/*/*.csv', union_by_name=true, filename=true)"
+    con = duckdb.connect()
+
+    # Sniff the unioned header once to decide which id columns to drop
+    columns = [
+        desc[0]
+        for desc in con.execute(f"SELECT * FROM {source} LIMIT 0").description
+    ]
+    drop_cols = [
+        col for col, lower in ((col, col.lower()) for col in columns)
+        if col in ID_SET or ('id' in lower and lower != OUTPUT_ID_LOWER)
+    ]
+    projection = "*"
+    if drop_cols:
+        quoted = ", ".join(f'"{col}"' for col in drop_cols)
+        projection = f"* EXCLUDE ({quoted})"
+
+    con.execute(
+        f"""
+        CREATE OR REPLACE TABLE precincts AS
+        SELECT
+            {projection},
+            lpad(ward::VARCHAR, 2, '0') || lpad(precinct::VARCHAR, 3, '0')
+                AS {OUTPUT_ID_COLUMN}
+        FROM {source}
+        """
+    )
+
+    parquet_path = DATA_DIR / 'precincts.parquet'
+    con.execute(f"COPY precincts TO '{parquet_path}' (FORMAT PARQUET)")
+
+    row_count = con.execute("SELECT COUNT(*) FROM precincts").fetchone()[0]
+    print(f"Ingested {row_count} rows from {DATA_DIR} into {parquet_path}")
+    logging.info(f"DuckDB direct ingest wrote {row_count} rows to {parquet_path}")
+
+
+def process_csv_task(task):
+    """Unpack a (csv_path, dir_name, csv_name) task for the process pool."""
+    return process_csv(*task)
 
 def main():
     """Main function to traverse directories and process CSV files."""
@@ -89,30 +180,41 @@ def main():
         print(f"Error: The directory {DATA_DIR} does not exist.")
         logging.error(f"The directory {DATA_DIR} does not exist.")
         return
-    
+
     print(f"Processing directory: {DATA_DIR}")
     logging.info(f"Started processing directory: {DATA_DIR}")
-    
-    # Count for reporting
-    total_files = 0
-    processed_files = 0
-    
-    # Traverse the directory structure
-    for dir_path in DATA_DIR.iterdir():
-        if dir_path.is_dir():
-            dir_name = dir_path.name
-            
-            # Process each CSV in the directory
-            for csv_path in dir_path.glob('*.csv'):
-                total_files += 1
-                csv_name = csv_path.name
-                print(f"Processing {csv_path}...")
-                process_csv(csv_path, dir_name, csv_name)
-                processed_files += 1
-    
+
+    # Clear out temp files left behind by a crashed or interrupted run
+    for stale in DATA_DIR.glob('*/*.tmp'):
+        stale.unlink()
+        logging.info(f"Removed stale temp file {stale}")
+
+    # Collect every CSV up front - each file is independent, so the pool
+    # below can process them in any order
+    tasks = [
+        (csv_path, dir_path.name, csv_path.name)
+        for dir_path in DATA_DIR.iterdir()
+        if dir_path.is_dir()
+        for csv_path in dir_path.glob('*.csv')
+    ]
+    total_files = len(tasks)
+
+    # Process files in parallel; spawn workers so each one re-imports the
+    # module and picks up the POLARS_MAX_THREADS cap
+    workers = os.cpu_count() or 1
+    print(f"Processing {total_files} files with {workers} workers...")
+    with ProcessPoolExecutor(
+        max_workers=workers, mp_context=multiprocessing.get_context("spawn")
+    ) as executor:
+        results = list(executor.map(process_csv_task, tasks))
+    processed_files = sum(1 for ok in results if ok)
+
     print(f"Processing complete. Processed {processed_files} out of {total_files} files.")
     logging.info(f"Processing complete. Processed {processed_files} out of {total_files} files.")
 
 if __name__ == "__main__":
-    main()
+    if "--duckdb-direct" in sys.argv:
+        ingest_duckdb_direct()
+    else:
+        main()
     print("Check the log file for details.")
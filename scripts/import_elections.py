@@ -1,9 +1,9 @@
-import glob
 import json
 import logging
 import multiprocessing
 import os
-from concurrent.futures import ProcessPoolExecutor
+import sys
+from concurrent.futures import ThreadPoolExecutor, as_completed
 from datetime import datetime
 
 import duckdb
@@ -22,10 +22,15 @@ CONFIG = {
     "base_dir": "output/",  # Path to the numbered directories
     "metadata_path": "output/results-metadata.json",  # Path to metadata JSON file
     "db_path": "chicago_elections.db",  # Path for the output DuckDB database
-    "batch_size": 100000,  # Number of rows to process in a batch
     "workers": max(1, multiprocessing.cpu_count() - 1),  # Leave one CPU free
 }
 
+# Pattern for pulling a float out of a percent cell, compiled once here
+# instead of per expression. Anchored so non-numeric cells are rejected
+# without scanning the whole string. (The matching integer pattern for vote
+# columns is gone - those are typed by the CSV parser at scan time.)
+FLOAT_RE = r"^\s*(-?\d+\.?\d*)"
+
 
 def load_metadata():
     """Load the metadata JSON file and return it as a dictionary."""
@@ -79,24 +84,8 @@ def init_database():
         """
         )
 
-        # Create a sequence table for tracking the next result_id
-        con.execute(
-            """
-            CREATE TABLE IF NOT EXISTS sequence_values (
-                name VARCHAR PRIMARY KEY,
-                next_value INTEGER
-            )
-        """
-        )
-
-        # Initialize the result_id sequence if it doesn't exist
-        con.execute(
-            """
-            INSERT INTO sequence_values (name, next_value)
-            SELECT 'result_id', 1
-            WHERE NOT EXISTS (SELECT 1 FROM sequence_values WHERE name = 'result_id')
-        """
-        )
+        # Sequence used to assign result_id at insert time
+        con.execute("CREATE SEQUENCE IF NOT EXISTS result_id_seq START 1")
 
         logger.info("Database initialized with tables")
         return con
@@ -105,21 +94,43 @@ def init_database():
         raise
 
 
+def prefetch_file(path):
+    """Hint the kernel to start reading a file before it is parsed.
+
+    posix_fadvise(WILLNEED | SEQUENTIAL) kicks off readahead so that on a
+    cold page cache the CSV parser streams from memory instead of stalling
+    on disk. A no-op on platforms without the call.
+    """
+    if not hasattr(os, "posix_fadvise"):
+        return
+    try:
+        fd = os.open(path, os.O_RDONLY)
+        try:
+            os.posix_fadvise(
+                fd, 0, 0, os.POSIX_FADV_WILLNEED | os.POSIX_FADV_SEQUENTIAL
+            )
+        finally:
+            os.close(fd)
+    except OSError:
+        pass
+
+
 def process_csv_file(
     csv_path, election_id, year, election_date, contest_id, contest_name
 ):
     """Process a single CSV file and return a Polars DataFrame of results."""
     try:
-        # Read the CSV file with Polars
-        df = pl.read_csv(csv_path, ignore_errors=True)
+        prefetch_file(csv_path)
 
-        # Check if dataframe is empty
-        if df.is_empty():
-            logger.warning(f"Empty dataframe from {csv_path}")
-            return None
+        # Scan the CSV lazily; every transformation below is chained onto one
+        # LazyFrame and materialized by a single streaming collect at the end
+        lf = pl.scan_csv(csv_path, ignore_errors=True)
+
+        # Resolve the header from the schema - no data is read
+        columns = lf.collect_schema().names()
 
         # Check if required columns are present
-        if "precinct_id" not in df.columns:
+        if "precinct_id" not in columns:
             logger.warning(f"CSV file {csv_path} is missing precinct_id column")
             return None
 
@@ -143,13 +154,13 @@ def process_csv_file(
         # Handle different CSV types based on column structure
 
         # Special case: registration/turnout data
-        if "registered" in df.columns and "turnout" in df.columns:
+        if "registered" in columns and "turnout" in columns:
             # Create two options: registered and ballots
             results = []
 
             # Create 'registered' option
-            registered_df = df.select(["precinct_id", "ward", "precinct", "registered"])
-            registered_df = registered_df.with_columns(
+            registered_lf = lf.select(["precinct_id", "ward", "precinct", "registered"])
+            registered_lf = registered_lf.with_columns(
                 [
                     pl.lit("registered").alias("option_name"),
                     pl.col("registered").alias("option_votes"),
@@ -157,11 +168,11 @@ def process_csv_file(
                     pl.lit(None).alias("total_votes"),
                 ]
             )
-            results.append(registered_df)
+            results.append(registered_lf)
 
             # Create 'ballots' option
-            ballots_df = df.select(["precinct_id", "ward", "precinct", "ballots"])
-            ballots_df = ballots_df.with_columns(
+            ballots_lf = lf.select(["precinct_id", "ward", "precinct", "ballots"])
+            ballots_lf = ballots_lf.with_columns(
                 [
                     pl.lit("ballots").alias("option_name"),
                     pl.col("ballots").alias("option_votes"),
@@ -169,23 +180,23 @@ def process_csv_file(
                     pl.lit(None).alias("total_votes"),
                 ]
             )
-            results.append(ballots_df)
+            results.append(ballots_lf)
 
             # Combine the results
-            results_df = pl.concat(results)
+            results_lf = pl.concat(results, rechunk=False)
 
         else:
             # Normal case: election results
 
             # Determine columns
-            ward_col = "ward" if "ward" in df.columns else None
-            precinct_col = "precinct" if "precinct" in df.columns else None
-            total_col = "total" if "total" in df.columns else None
+            ward_col = "ward" if "ward" in columns else None
+            precinct_col = "precinct" if "precinct" in columns else None
+            total_col = "total" if "total" in columns else None
 
             # Find voting option columns - they don't end with "Percent"
             option_cols = [
                 col
-                for col in df.columns
+                for col in columns
                 if col
                 not in [
                     "precinct_id",
@@ -203,6 +214,16 @@ def process_csv_file(
                 logger.warning(f"No voting option columns found in {csv_path}")
                 return None
 
+            # Re-scan with the vote columns typed Int32 so the CSV parser
+            # coerces them during the parse itself (ignore_errors turns
+            # anything non-numeric into null) - no regex cleanup needed later
+            int_overrides = {col: pl.Int32 for col in option_cols}
+            if total_col:
+                int_overrides[total_col] = pl.Int32
+            lf = pl.scan_csv(
+                csv_path, ignore_errors=True, schema_overrides=int_overrides
+            )
+
             # Create ID variables list for melting
             id_vars = ["precinct_id"]
             if ward_col:
@@ -212,9 +233,9 @@ def process_csv_file(
             if total_col:
                 id_vars.append(total_col)
 
-            # Melt the dataframe to get long format
+            # Melt the frame to get long format
             try:
-                results_df = df.melt(
+                results_lf = lf.melt(
                     id_vars=id_vars,
                     value_vars=option_cols,
                     variable_name="option_name",
@@ -224,84 +245,72 @@ def process_csv_file(
                 logger.error(f"Melt operation failed on {csv_path}: {e}")
                 return None
 
-            # Add percentage values if available
-            results_df = results_df.with_columns(pl.lit(None).alias("option_percent"))
-
-            for option in option_cols:
-                percent_col = f"{option} Percent"
-                if percent_col in df.columns:
-                    # Update percentage for matching rows
-                    mask = results_df["option_name"] == option
-                    if mask.any():
-                        # Join percentage values
-                        percent_df = df.select(["precinct_id", percent_col])
-                        results_df = results_df.with_columns(
-                            pl.when(mask)
-                            .then(
-                                results_df.join(percent_df, on="precinct_id")[
-                                    percent_col
-                                ]
-                            )
-                            .otherwise(pl.col("option_percent"))
-                            .alias("option_percent")
-                        )
+            # Add percentage values if available: unpivot the percent columns
+            # once and attach them with a single join on
+            # (precinct_id, option_name) instead of a join per option
+            percent_cols = [
+                f"{option} Percent"
+                for option in option_cols
+                if f"{option} Percent" in columns
+            ]
+            if percent_cols:
+                percent_long = (
+                    lf.select(["precinct_id"] + percent_cols)
+                    .melt(
+                        id_vars="precinct_id",
+                        variable_name="option_name",
+                        value_name="option_percent",
+                    )
+                    .with_columns(pl.col("option_name").str.strip_suffix(" Percent"))
+                )
+                results_lf = results_lf.join(
+                    percent_long, on=["precinct_id", "option_name"], how="left"
+                )
+            else:
+                results_lf = results_lf.with_columns(
+                    pl.lit(None).alias("option_percent")
+                )
 
         # Rename 'total' to 'total_votes' if it exists
         if total_col:
-            results_df = results_df.rename({total_col: "total_votes"})
+            results_lf = results_lf.rename({total_col: "total_votes"})
         else:
-            results_df = results_df.with_columns(pl.lit(None).alias("total_votes"))
+            results_lf = results_lf.with_columns(
+                pl.lit(None, dtype=pl.Int32).alias("total_votes")
+            )
 
         # Ensure all required columns exist with correct types
         if ward_col is None:
-            results_df = results_df.with_columns(
+            results_lf = results_lf.with_columns(
                 pl.lit(None).cast(pl.Utf8).alias("ward")
             )
 
         if precinct_col is None:
-            results_df = results_df.with_columns(
+            results_lf = results_lf.with_columns(
                 pl.lit(None).cast(pl.Utf8).alias("precinct")
             )
 
-        # Handle data types and conversions explicitly
-        # First, convert all values to strings to handle mixed types
-        for col in ["option_votes", "total_votes"]:
-            if col in results_df.columns:
-                # Convert to string first, then extract numbers, then to integers
-                results_df = results_df.with_columns(
-                    pl.when(pl.col(col).is_null())
-                    .then(pl.lit(0))
-                    .otherwise(pl.col(col))
-                    .alias(col)
-                )
-
-                # For numeric columns, ensure they're integers (handle string values)
-                results_df = results_df.with_columns(
-                    pl.col(col)
-                    .cast(pl.Utf8)
-                    .str.extract(r"(\d+)", 1)
-                    .fill_null("0")
-                    .cast(pl.Int32)
-                    .alias(col)
-                )
+        # Vote columns were already typed at scan time; just default nulls to 0
+        results_lf = results_lf.with_columns(
+            [pl.col(col).fill_null(0) for col in ["option_votes", "total_votes"]]
+        )
 
         # Convert option_percent to float
-        if "option_percent" in results_df.columns:
-            results_df = results_df.with_columns(
-                pl.when(pl.col("option_percent").is_null())
-                .then(pl.lit(0.0))
-                .otherwise(pl.col("option_percent"))
-                .alias("option_percent")
-            )
+        results_lf = results_lf.with_columns(
+            pl.when(pl.col("option_percent").is_null())
+            .then(pl.lit(0.0))
+            .otherwise(pl.col("option_percent"))
+            .alias("option_percent")
+        )
 
-            results_df = results_df.with_columns(
-                pl.col("option_percent")
-                .cast(pl.Utf8)
-                .str.extract(r"(\d+\.?\d*)", 1)
-                .fill_null("0.0")
-                .cast(pl.Float64)
-                .alias("option_percent")
-            )
+        results_lf = results_lf.with_columns(
+            pl.col("option_percent")
+            .cast(pl.Utf8)
+            .str.extract(FLOAT_RE, 1)
+            .fill_null("0.0")
+            .cast(pl.Float64)
+            .alias("option_percent")
+        )
 
         # Add metadata columns that are missing
         metadata_columns = {
@@ -313,18 +322,26 @@ def process_csv_file(
             "result_id": -1,  # Placeholder
         }
 
-        for col_name, col_value in metadata_columns.items():
-            if col_name not in results_df.columns:
-                results_df = results_df.with_columns(pl.lit(col_value).alias(col_name))
+        # Build the whole projection in one pass: existing columns are
+        # referenced, anything missing becomes a literal (the metadata value,
+        # or null for CSV-derived columns), and a single select puts it all
+        # in standard order - no per-column with_columns copies
+        result_columns = set(results_lf.collect_schema().names())
+        exprs = [
+            pl.col(col)
+            if col in result_columns
+            else pl.lit(metadata_columns.get(col)).alias(col)
+            for col in standard_columns
+        ]
 
-        # Ensure we have all standard columns in the right order
-        # First, make sure all standard columns exist
-        for col in standard_columns:
-            if col not in results_df.columns:
-                results_df = results_df.with_columns(pl.lit(None).alias(col))
+        # Run the whole fused pipeline in one streaming pass. Emptiness is
+        # checked on the collected result rather than with an up-front row
+        # count, which cost a full extra scan of every file
+        results_df = results_lf.select(exprs).collect(engine="streaming")
 
-        # Then select only the standard columns in the right order
-        results_df = results_df.select(standard_columns)
+        if results_df.is_empty():
+            logger.warning(f"Empty dataframe from {csv_path}")
+            return None
 
         logger.info(f"Processed {csv_path}: {len(results_df)} results")
         return results_df
@@ -334,21 +351,160 @@ def process_csv_file(
         return None
 
 
+def process_csv_duckdb(
+    con, csv_path, election_id, year, election_date, contest_id, contest_name
+):
+    """Ingest a single CSV straight into DuckDB with read_csv_auto + UNPIVOT.
+
+    The parse, melt, and type coercion all happen inside DuckDB's execution
+    engine, and the rows land in election_results in one INSERT - no Polars
+    hop. Returns the number of rows inserted.
+    """
+    try:
+        prefetch_file(csv_path)
+
+        # Sniff the header only - DESCRIBE binds the CSV reader without
+        # scanning the data
+        columns = [
+            row[0]
+            for row in con.execute(
+                f"DESCRIBE SELECT * FROM read_csv_auto('{csv_path}')"
+            ).fetchall()
+        ]
+
+        if "precinct_id" not in columns:
+            logger.warning(f"CSV file {csv_path} is missing precinct_id column")
+            return 0
+
+        option_cols = [
+            col
+            for col in columns
+            if col
+            not in [
+                "precinct_id",
+                "ward",
+                "precinct",
+                "total",
+                "registered",
+                "ballots",
+                "turnout",
+            ]
+            and not str(col).endswith("Percent")
+        ]
+        if not option_cols:
+            logger.warning(f"No voting option columns found in {csv_path}")
+            return 0
+
+        def quote(col):
+            return '"' + str(col).replace('"', '""') + '"'
+
+        # Coerce the vote columns to INTEGER before the unpivot so NULL cells
+        # become 0 instead of being dropped (UNPIVOT skips NULL values)
+        vote_exprs = ", ".join(
+            f"COALESCE(TRY_CAST({quote(col)} AS INTEGER), 0) AS {quote(col)}"
+            for col in option_cols
+        )
+        vote_col_list = ", ".join(quote(col) for col in option_cols)
+
+        id_exprs = ["CAST(precinct_id AS VARCHAR) AS precinct_id"]
+        if "ward" in columns:
+            id_exprs.append("CAST(ward AS VARCHAR) AS ward")
+        if "precinct" in columns:
+            id_exprs.append("CAST(precinct AS VARCHAR) AS precinct")
+        if "total" in columns:
+            id_exprs.append('COALESCE(TRY_CAST("total" AS INTEGER), 0) AS total_votes')
+        ward_expr = "v.ward" if "ward" in columns else "NULL"
+        precinct_expr = "v.precinct" if "precinct" in columns else "NULL"
+        total_expr = "v.total_votes" if "total" in columns else "0"
+
+        percent_cols = [
+            f"{option} Percent"
+            for option in option_cols
+            if f"{option} Percent" in columns
+        ]
+        if percent_cols:
+            # Unpivot the percent columns separately and attach them with a
+            # join on (precinct_id, option_name), mirroring the Polars path
+            pct_exprs = ", ".join(
+                "COALESCE(TRY_CAST(regexp_extract(CAST({0} AS VARCHAR),"
+                " '(\\d+\\.?\\d*)', 1) AS DOUBLE), 0.0) AS {0}".format(quote(col))
+                for col in percent_cols
+            )
+            pct_col_list = ", ".join(quote(col) for col in percent_cols)
+            percent_expr = "COALESCE(p.option_percent, 0.0)"
+            percent_join = f"""
+                LEFT JOIN (
+                    SELECT
+                        precinct_id,
+                        left(option_name, length(option_name) - 8) AS option_name,
+                        option_percent
+                    FROM (
+                        SELECT CAST(precinct_id AS VARCHAR) AS precinct_id, {pct_exprs}
+                        FROM read_csv_auto('{csv_path}')
+                    ) UNPIVOT (option_percent FOR option_name IN ({pct_col_list}))
+                ) p USING (precinct_id, option_name)
+            """
+        else:
+            percent_expr = "0.0"
+            percent_join = ""
+
+        inserted = con.execute(
+            f"""
+            INSERT INTO election_results
+            SELECT
+                nextval('result_id_seq'),
+                ?, ?, ?, ?, ?,
+                v.precinct_id,
+                {ward_expr},
+                {precinct_expr},
+                {total_expr},
+                v.option_name,
+                v.option_votes,
+                {percent_expr}
+            FROM (
+                SELECT {", ".join(id_exprs)}, {vote_exprs}
+                FROM read_csv_auto('{csv_path}')
+            ) UNPIVOT (option_votes FOR option_name IN ({vote_col_list})) v
+            {percent_join}
+            """,
+            [year, election_date, election_id, contest_id, contest_name],
+        ).fetchone()[0]
+
+        logger.info(f"Processed {csv_path}: {inserted} results")
+        return inserted
+
+    except Exception as e:
+        logger.error(f"Failed to process CSV file {csv_path}: {e}")
+        return 0
+
+
+# Metadata dict shared by every worker in the pool; set once by _init_worker
+# instead of travelling in each task message
+_META = None
+
+
+def _init_worker(metadata):
+    global _META
+    _META = metadata
+
+
 def process_directory(args):
     """Process all CSV files in a directory."""
-    directory_id, directory_path, metadata = args
+    directory_id, directory_path = args
     try:
         dir_id_str = str(directory_id)
-        if dir_id_str not in metadata:
+        if dir_id_str not in _META:
             logger.warning(f"Directory {directory_id} not found in metadata, skipping")
             return None
 
-        dir_data = metadata[dir_id_str]
+        dir_data = _META[dir_id_str]
         year = dir_data.get("year")
         election_date = dir_data.get("date")
 
-        # Get all CSV files in this directory
-        csv_files = glob.glob(os.path.join(directory_path, "*.csv"))
+        # Get all CSV files in this directory - scandir reads names and
+        # types in one pass, with no stat call per entry
+        with os.scandir(directory_path) as it:
+            csv_files = [e.path for e in it if e.name.endswith(".csv")]
         logger.info(
             f"Processing directory {directory_id}: found {len(csv_files)} CSV files"
         )
@@ -370,9 +526,16 @@ def process_directory(args):
 
             file_id = int(file_id_str)
 
-            # Get contest name from metadata
+            # Get contest name from metadata. A file the races listing
+            # doesn't know about has no contest to attach to, so skip it
+            # up front instead of paying for a full CSV parse
             contest_name = None
-            if "races" in dir_data and file_id_str in dir_data["races"]:
+            if "races" in dir_data:
+                if file_id_str not in dir_data["races"]:
+                    logger.warning(
+                        f"Skipping {file_name}: not listed in metadata races"
+                    )
+                    continue
                 contest_name = dir_data["races"][file_id_str]
 
             # Process the CSV file
@@ -394,9 +557,12 @@ def process_directory(args):
         if all_results:
             try:
                 # Since we've standardized the schema in process_csv_file,
-                # concat should work without issues now
-                combined_results = pl.concat(all_results)
-                return combined_results
+                # concat should work without issues now. rechunk=False keeps
+                # the per-file chunks as-is instead of recopying every column
+                # into one contiguous buffer - DuckDB's Arrow scan consumes
+                # chunked arrays natively. Workers are threads, so the frame
+                # is handed back by reference - no serialization
+                return pl.concat(all_results, rechunk=False)
             except Exception as e:
                 logger.error(
                     f"Failed to combine results for directory {directory_id}: {e}"
@@ -415,49 +581,34 @@ def process_directory(args):
         return None
 
 
-def save_results_to_duckdb(results_df, next_id, con):
+def save_results_to_duckdb(results_df, con):
     """Save results DataFrame to DuckDB."""
     try:
         if results_df is None or len(results_df) == 0:
-            return next_id
+            return
 
-        # Assign sequential IDs
         num_rows = len(results_df)
-        results_df = results_df.with_columns(
-            pl.arange(next_id, next_id + num_rows).cast(pl.Int32).alias("result_id")
-        )
 
-        # Handle string-to-numeric conversion for option_votes and total_votes
-        for col in ["option_votes", "total_votes"]:
-            results_df = results_df.with_columns(
-                pl.col(col).cast(pl.Int32).fill_null(0).alias(col)
+        # Vote and percent columns arrive already typed and null-filled from
+        # process_csv_file, so no normalization pass is needed here
+
+        # Hand the batch to DuckDB as Arrow - the Arrow scan consumes the
+        # Polars buffers without the pandas materialization/copy
+        arrow_tbl = results_df.to_arrow()
+        con.register("batch_arrow", arrow_tbl)
+        try:
+            # The database assigns result_id from the sequence as it inserts
+            con.execute(
+                """
+                INSERT INTO election_results
+                SELECT nextval('result_id_seq'), * EXCLUDE (result_id)
+                FROM batch_arrow
+                """
             )
-
-        # Handle option_percent conversion
-        results_df = results_df.with_columns(
-            pl.col("option_percent")
-            .cast(pl.Float64)
-            .fill_null(0.0)
-            .alias("option_percent")
-        )
-
-        # Convert to pandas for DuckDB
-        pd_df = results_df.to_pandas()
-
-        # Bulk insert using DuckDB's fast loading
-        con.execute("INSERT INTO election_results SELECT * FROM pd_df")
-
-        # Update next_id
-        next_id += num_rows
-
-        # Update the sequence
-        con.execute(
-            "UPDATE sequence_values SET next_value = ? WHERE name = 'result_id'",
-            [next_id],
-        )
+        finally:
+            con.unregister("batch_arrow")
 
         logger.info(f"Saved {num_rows} rows to database")
-        return next_id
     except Exception as e:
         logger.error(f"Failed to save results to database: {e}")
         # Log additional debug info
@@ -488,10 +639,21 @@ def create_views(con):
         """
         )
 
-        # Create a view for contest results
+        # Contest results: total_votes repeats once per option row after the
+        # melt, so summing it directly multiplied every contest total by its
+        # option count. Deduplicate per (contest, precinct) first, and
+        # materialize the small result as a table at load time so queries
+        # don't rescan the fact table. The DROP clears a contest_summary
+        # view left by older databases; once this function has created the
+        # table, DROP VIEW raises a type mismatch that CREATE OR REPLACE
+        # TABLE below handles anyway
+        try:
+            con.execute("DROP VIEW IF EXISTS contest_summary")
+        except duckdb.CatalogException:
+            pass
         con.execute(
             """
-            CREATE OR REPLACE VIEW contest_summary AS
+            CREATE OR REPLACE TABLE contest_summary AS
             SELECT
                 contest_id,
                 contest_name,
@@ -499,8 +661,16 @@ def create_views(con):
                 election_date,
                 COUNT(DISTINCT precinct_id) as precinct_count,
                 SUM(total_votes) as total_votes
-            FROM
-                election_results
+            FROM (
+                SELECT DISTINCT
+                    contest_id,
+                    contest_name,
+                    year,
+                    election_date,
+                    precinct_id,
+                    total_votes
+                FROM election_results
+            )
             GROUP BY
                 contest_id, contest_name, year, election_date
             ORDER BY
@@ -537,6 +707,32 @@ def create_views(con):
         raise
 
 
+def export_parquet(con):
+    """Materialize election_results to Parquet for downstream consumers.
+
+    The summary views are pure aggregation scans that touch a handful of
+    the 13 columns, so a columnar file with column pruning and dictionary
+    encoding serves them far better than the row-oriented table. The
+    election_results_parquet view exposes the export alongside the table.
+    """
+    try:
+        parquet_path = "election_results.parquet"
+        con.execute(
+            f"COPY election_results TO '{parquet_path}' "
+            "(FORMAT PARQUET, COMPRESSION ZSTD)"
+        )
+        con.execute(
+            f"""
+            CREATE OR REPLACE VIEW election_results_parquet AS
+            SELECT * FROM read_parquet('{parquet_path}')
+            """
+        )
+        logger.info(f"Exported results to {parquet_path}")
+    except Exception as e:
+        logger.error(f"Failed to export Parquet: {e}")
+        raise
+
+
 def main():
     start_time = datetime.now()
     logger.info(f"Starting election data ETL process at {start_time}")
@@ -548,51 +744,61 @@ def main():
         # Initialize the database
         con = init_database()
 
-        # Clear existing data to avoid duplicates
+        # Clear existing data to avoid duplicates and restart the id sequence
         con.execute("DELETE FROM election_results")
-        con.execute(
-            "UPDATE sequence_values SET next_value = 1 WHERE name = 'result_id'"
-        )
-
-        # Get the next available result_id
-        next_id = con.execute(
-            "SELECT next_value FROM sequence_values WHERE name = 'result_id'"
-        ).fetchone()[0]
+        con.execute("CREATE OR REPLACE SEQUENCE result_id_seq START 1")
+
+        # Get list of all directories - scandir carries the entry type back
+        # from the directory read, avoiding an isdir stat per entry
+        with os.scandir(CONFIG["base_dir"]) as it:
+            all_dirs = [
+                (int(entry.name), entry.path)
+                for entry in it
+                if entry.is_dir(follow_symlinks=False) and entry.name.isdigit()
+            ]
 
-        # Get list of all directories
-        all_dirs = []
-        for directory_name in os.listdir(CONFIG["base_dir"]):
-            directory_path = os.path.join(CONFIG["base_dir"], directory_name)
-            if os.path.isdir(directory_path) and directory_name.isdigit():
-                all_dirs.append((int(directory_name), directory_path))
+        # Start the biggest directories first: with as_completed scheduling
+        # the long poles begin while the pool is full instead of becoming
+        # stragglers on an almost-drained pool at the end
+        def dir_csv_bytes(path):
+            with os.scandir(path) as it:
+                return sum(e.stat().st_size for e in it if e.name.endswith(".csv"))
 
-        # Sort by directory ID for organized processing
-        all_dirs.sort()
+        all_dirs.sort(key=lambda d: dir_csv_bytes(d[1]), reverse=True)
 
         logger.info(f"Found {len(all_dirs)} directories to process")
 
-        # Prepare arguments for parallel processing
-        process_args = [(dir_id, dir_path, metadata) for dir_id, dir_path in all_dirs]
-
-        # Process directories in parallel
-        with ProcessPoolExecutor(max_workers=CONFIG["workers"]) as executor:
-            results = list(executor.map(process_directory, process_args))
-
-        # Save all results to the database
+        # Process directories in parallel and ingest each result as soon as
+        # it lands, so peak memory stays at ~workers frames and the insert
+        # overlaps with parsing instead of waiting for every directory.
+        # Threads are enough here: Polars parses CSVs in Rust with the GIL
+        # released, and skipping processes removes the fork and the
+        # serialization of every result batch. The DuckDB connection is only
+        # touched on this thread, so no lock is needed around the inserts
         total_results = 0
-        for results_df in results:
-            if results_df is not None and len(results_df) > 0:
-                # Process in batches to manage memory
-                for i in range(0, len(results_df), CONFIG["batch_size"]):
-                    batch_df = results_df.slice(
-                        i, min(CONFIG["batch_size"], len(results_df) - i)
-                    )
-                    next_id = save_results_to_duckdb(batch_df, next_id, con)
-                    total_results += len(batch_df)
+        with ThreadPoolExecutor(
+            max_workers=CONFIG["workers"],
+            initializer=_init_worker,
+            initargs=(metadata,),
+        ) as executor:
+            futures = [
+                executor.submit(process_directory, args) for args in all_dirs
+            ]
+            for future in as_completed(futures):
+                results_df = future.result()
+                if results_df is None or len(results_df) == 0:
+                    continue
+                save_results_to_duckdb(results_df, con)
+                total_results += len(results_df)
+                # Drop the reference so the worker's frame frees immediately
+                del results_df
 
         # Create helpful views
         create_views(con)
 
+        # Export a columnar copy for downstream analytics
+        export_parquet(con)
+
         # Get statistics
         elections = con.execute(
             "SELECT COUNT(DISTINCT election_id) FROM election_results"
@@ -620,5 +826,89 @@ def main():
         logger.error(f"ETL process failed after {duration}: {e}")
 
 
+def main_duckdb_direct():
+    """Alternate ETL entry point that keeps the whole pipeline inside DuckDB.
+
+    Directories are walked serially - DuckDB's CSV reader is already
+    multithreaded, so there is no worker pool and no result batches to
+    ship between processes.
+    """
+    start_time = datetime.now()
+    logger.info(f"Starting DuckDB-direct ETL process at {start_time}")
+
+    try:
+        metadata = load_metadata()
+        con = init_database()
+
+        # Clear existing data to avoid duplicates and restart the id sequence
+        con.execute("DELETE FROM election_results")
+        con.execute("CREATE OR REPLACE SEQUENCE result_id_seq START 1")
+
+        with os.scandir(CONFIG["base_dir"]) as it:
+            all_dirs = [
+                (int(entry.name), entry.path)
+                for entry in it
+                if entry.is_dir(follow_symlinks=False) and entry.name.isdigit()
+            ]
+        all_dirs.sort()
+
+        logger.info(f"Found {len(all_dirs)} directories to process")
+
+        total_results = 0
+        for directory_id, directory_path in all_dirs:
+            dir_id_str = str(directory_id)
+            if dir_id_str not in metadata:
+                logger.warning(
+                    f"Directory {directory_id} not found in metadata, skipping"
+                )
+                continue
+
+            dir_data = metadata[dir_id_str]
+            year = dir_data.get("year")
+            election_date = dir_data.get("date")
+
+            with os.scandir(directory_path) as it:
+                csv_files = [e.path for e in it if e.name.endswith(".csv")]
+
+            for csv_path in csv_files:
+                file_name = os.path.basename(csv_path)
+                file_id_str = file_name.split(".")[0]
+                if not file_id_str.isdigit():
+                    logger.warning(f"Skipping non-numeric filename: {file_name}")
+                    continue
+
+                contest_name = dir_data.get("races", {}).get(file_id_str)
+                total_results += process_csv_duckdb(
+                    con,
+                    csv_path,
+                    directory_id,
+                    year,
+                    election_date,
+                    int(file_id_str),
+                    contest_name,
+                )
+
+        create_views(con)
+        export_parquet(con)
+
+        logger.info(f"ETL process complete:")
+        logger.info(f"  - {total_results} result records created")
+
+        con.close()
+
+        end_time = datetime.now()
+        duration = end_time - start_time
+        logger.info(f"ETL process completed successfully in {duration}")
+
+    except Exception as e:
+        logger.error(f"Main process failed: {e}")
+        end_time = datetime.now()
+        duration = end_time - start_time
+        logger.error(f"ETL process failed after {duration}: {e}")
+
+
 if __name__ == "__main__":
-    main()
+    if "--duckdb-direct" in sys.argv:
+        main_duckdb_direct()
+    else:
+        main()
